@@ -0,0 +1,42 @@
+"""Catapillar: a tiny bilingual (中文/English) language that lowers to Python.
+
+The package is split into two stages: :mod:`catapillar.parser` turns source
+text into a Program/Flow/Segment tree of statement nodes, and
+:mod:`catapillar.mapper` walks that tree and emits Python source text.
+"""
+
+from .parser import (
+    Arrow,
+    Block,
+    BlockEnd,
+    CatapillarSyntaxError,
+    Flow,
+    Line,
+    Program,
+    Segment,
+    parse,
+    parse_tokens,
+    tokenize,
+)
+from .mapper import CatapillarMappingError, map_program_to_python
+from .pycodegen import compile_program
+
+__version__ = "0.3.0"
+
+__all__ = [
+    "Arrow",
+    "Block",
+    "BlockEnd",
+    "CatapillarMappingError",
+    "CatapillarSyntaxError",
+    "Flow",
+    "Line",
+    "Program",
+    "Segment",
+    "compile_program",
+    "map_program_to_python",
+    "parse",
+    "parse_tokens",
+    "tokenize",
+    "__version__",
+]
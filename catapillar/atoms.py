@@ -0,0 +1,137 @@
+"""Bulk atom classification for batch transpilation.
+
+When many ``.cat`` files are mapped in one process, classifying every
+atom through the per-symbol helpers in :mod:`catapillar.mapper` is the
+bottleneck.  :func:`classify_atoms` tags a whole batch of atoms in a
+single pass; the mapper can then dispatch on the precomputed tags.
+
+The numeric check — the expensive part — runs over a packed ``uint8``
+buffer.  When numba (and numpy) are installed the kernel is JIT-compiled;
+otherwise the same loop runs in pure Python and a
+:class:`CatapillarWarning` is emitted once.
+"""
+
+import warnings
+from typing import List, Sequence
+
+
+class CatapillarWarning(UserWarning):
+    """Non-fatal degradation notices (e.g. optional accelerators missing)."""
+
+
+# Atom tags, densely numbered so they can index an emitter table.
+TAG_NUM = 0
+TAG_IDENT = 1
+TAG_BOOL = 2
+TAG_NONE = 3
+TAG_STR = 4
+TAG_OTHER = 5
+
+_BOOL_WORDS = frozenset(("真", "True", "假", "False"))
+_NONE_WORDS = frozenset(("空", "None"))
+
+try:  # pragma: no cover - exercised only where numba is installed
+    import numpy as _np
+    from numba import njit as _njit
+except ImportError:
+    _np = None
+    _njit = None
+
+_warned_fallback = False
+
+
+def _numeric_flags(buf, offsets, flags):
+    """Set ``flags[i]`` if ``buf[offsets[i]:offsets[i+1]]`` is a number.
+
+    Grammar matches mapper.is_numeric: ``[-+]?(\\d+\\.?\\d*|\\.\\d+)``
+    with an optional ``[eE][-+]?\\d+`` exponent.  Written against plain
+    indexed byte access so numba can compile it unchanged.
+    """
+    for n in range(len(flags)):
+        i = offsets[n]
+        end = offsets[n + 1]
+        if i < end and (buf[i] == 43 or buf[i] == 45):  # + -
+            i += 1
+        digits = 0
+        while i < end and 48 <= buf[i] <= 57:
+            i += 1
+            digits += 1
+        if i < end and buf[i] == 46:  # .
+            i += 1
+            while i < end and 48 <= buf[i] <= 57:
+                i += 1
+                digits += 1
+        if digits == 0:
+            continue
+        if i < end and (buf[i] == 101 or buf[i] == 69):  # e E
+            i += 1
+            if i < end and (buf[i] == 43 or buf[i] == 45):
+                i += 1
+            exp_digits = 0
+            while i < end and 48 <= buf[i] <= 57:
+                i += 1
+                exp_digits += 1
+            if exp_digits == 0:
+                continue
+        if i == end:
+            flags[n] = 1
+
+
+if _njit is not None:
+    _numeric_flags_jit = _njit(cache=True)(_numeric_flags)
+else:
+    _numeric_flags_jit = None
+
+
+def _numeric_mask(candidates: List[bytes]) -> List[int]:
+    """Run the numeric kernel over *candidates*, JIT-compiled if possible."""
+    global _warned_fallback
+    if _numeric_flags_jit is not None:
+        offsets = _np.zeros(len(candidates) + 1, dtype=_np.int64)
+        for n, raw in enumerate(candidates):
+            offsets[n + 1] = offsets[n] + len(raw)
+        buf = _np.frombuffer(b"".join(candidates), dtype=_np.uint8)
+        flags = _np.zeros(len(candidates), dtype=_np.uint8)
+        _numeric_flags_jit(buf, offsets, flags)
+        return flags.tolist()
+    if not _warned_fallback:
+        _warned_fallback = True
+        warnings.warn(
+            "numba is not available; bulk atom classification runs in "
+            "pure Python",
+            CatapillarWarning,
+            stacklevel=3,
+        )
+    offsets = [0]
+    for raw in candidates:
+        offsets.append(offsets[-1] + len(raw))
+    buf = b"".join(candidates)
+    flags = [0] * len(candidates)
+    _numeric_flags(buf, offsets, flags)
+    return flags
+
+
+def classify_atoms(atoms: Sequence[str]) -> List[int]:
+    """Tag every atom in one pass; returns a parallel list of ``TAG_*``."""
+    tags = [TAG_OTHER] * len(atoms)
+    candidates = []
+    candidate_slots = []
+    for n, atom in enumerate(atoms):
+        if atom in _BOOL_WORDS:
+            tags[n] = TAG_BOOL
+        elif atom in _NONE_WORDS:
+            tags[n] = TAG_NONE
+        elif len(atom) > 1 and atom[0] in ('"', "'") and atom[-1] == atom[0]:
+            tags[n] = TAG_STR
+        elif atom and atom[0] in "-+.0123456789":
+            candidates.append(atom.encode("ascii", "replace"))
+            candidate_slots.append(n)
+        elif atom.isidentifier():
+            tags[n] = TAG_IDENT
+    if candidates:
+        for flag, n in zip(_numeric_mask(candidates), candidate_slots):
+            if flag:
+                tags[n] = TAG_NUM
+            elif atoms[n].isidentifier():
+                tags[n] = TAG_IDENT
+    return tags
@@ -0,0 +1,407 @@
+"""Lower a parsed catapillar Program tree to Python source text.
+
+Each ``map_*`` function handles one statement form.  Block-opening
+handlers receive the :class:`IndentContext` so they can bump the
+indentation for the statements that follow; ``BlockEnd`` nodes pop it
+back.
+"""
+
+import functools
+import re
+from typing import List
+
+from . import atoms as _atoms
+from .parser import (  # noqa: F401  (BLOCK_ACTIONS re-exported for tooling)
+    BLOCK_ACTIONS,
+    Arrow,
+    BlockEnd,
+    Line,
+    Program,
+)
+
+
+class CatapillarMappingError(ValueError):
+    """Raised when a statement node cannot be lowered to Python."""
+
+
+_STRING_QUOTES = ('"', "'")
+
+
+def is_valid_identifier(symbol: str) -> bool:
+    """True if *symbol* can be emitted bare as a Python identifier."""
+    return symbol.isidentifier()
+
+
+_NUM_RE = re.compile(r"[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\Z")
+
+
+@functools.lru_cache(maxsize=4096)
+def is_numeric(symbol: str) -> bool:
+    """True if *symbol* parses as a Python number literal.
+
+    The first-char test rejects almost every identifier before the regex
+    engine is entered; nothing on this path ever raises, unlike the old
+    try/except float() probe.
+    """
+    return (
+        bool(symbol)
+        and symbol[0] in "-+.0123456789"
+        and _NUM_RE.match(symbol) is not None
+    )
+
+
+# Emitters indexed by atoms.TAG_*; used when an atom was bulk-tagged.
+_TAG_EMITTERS = (
+    lambda symbol: symbol,  # TAG_NUM
+    lambda symbol: symbol,  # TAG_IDENT
+    lambda symbol: "True" if symbol in ("真", "True") else "False",  # TAG_BOOL
+    lambda symbol: "None",  # TAG_NONE
+    lambda symbol: symbol,  # TAG_STR
+    repr,  # TAG_OTHER
+)
+
+# symbol -> atoms.TAG_* for atoms seen by pretag_program.
+_ATOM_TAGS: dict = {}
+
+
+def pretag_program(program) -> None:
+    """Bulk-classify every atom in *program* ahead of mapping.
+
+    One classify_atoms pass (JIT-accelerated when numba is available)
+    replaces per-atom classification during the subsequent map; useful
+    when transpiling many files in one process.
+    """
+    unique = set()
+    for flow in program.flows:
+        for segment in flow.segments:
+            for stmt in segment.lines:
+                args = getattr(stmt, "args", None)
+                if args:
+                    unique.update(args)
+    fresh = [atom for atom in unique if atom not in _ATOM_TAGS]
+    if fresh:
+        _ATOM_TAGS.update(zip(fresh, _atoms.classify_atoms(fresh)))
+
+
+_TRUE_WORDS = frozenset(("真", "True"))
+_FALSE_WORDS = frozenset(("假", "False"))
+_NONE_WORDS = frozenset(("空", "None"))
+_KEYWORD_ATOMS = _TRUE_WORDS | _FALSE_WORDS | _NONE_WORDS
+
+_CONDITION_OPS = frozenset(
+    ("==", "!=", ">", "<", ">=", "<=", "or", "and", "not", "(", ")")
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def to_py_value(symbol: str) -> str:
+    """Translate a single atom into a Python expression fragment."""
+    tag = _ATOM_TAGS.get(symbol)
+    if tag is not None:
+        return _TAG_EMITTERS[tag](symbol)
+    # Plain identifiers (variable names) dominate, so test them first;
+    # the keyword words are themselves identifiers and need unpicking.
+    if symbol.isidentifier():
+        if symbol not in _KEYWORD_ATOMS:
+            return symbol
+        if symbol in _TRUE_WORDS:
+            return "True"
+        if symbol in _FALSE_WORDS:
+            return "False"
+        return "None"
+    if is_numeric(symbol):
+        return symbol
+    if len(symbol) > 1 and symbol[0] in _STRING_QUOTES and symbol[-1] == symbol[0]:
+        return symbol
+    return repr(symbol)
+
+
+@functools.lru_cache(maxsize=4096)
+def to_py_value_for_condition(symbol: str) -> str:
+    """Like :func:`to_py_value` but lets comparison operators through."""
+    if symbol in _CONDITION_OPS:
+        return symbol
+    return to_py_value(symbol)
+
+
+_COND_TOK_MAP = {"不是": "!=", "是": "==", "或": "or", "且": "and"}
+
+
+def build_condition(args: List[str]) -> str:
+    """Translate condition tokens; the args are already tokenized."""
+    out = []
+    for arg in args:
+        translated = _COND_TOK_MAP.get(arg)
+        out.append(translated if translated is not None
+                   else to_py_value_for_condition(arg))
+    return " ".join(out)
+
+
+class IndentContext:
+    """Tracks the current indentation depth while emitting Python."""
+
+    def __init__(self, indent_str: str = "    "):
+        self.indent_str = indent_str
+        self.level = 0
+        # One prebuilt indent string per level, grown on demand, so
+        # get_indent() never allocates (it runs for every emitted line).
+        self._cache = [""]
+        # The single output buffer all map_* handlers append to; joined
+        # once at the end of map_program_to_python.
+        self.out: List[str] = []
+        # Per-level cache of constant statements ("break", "else:", ...)
+        # already carrying their indent, filled lazily by simple().
+        self._simple: List[dict] = [{}]
+
+    def simple(self, stmt: str) -> str:
+        """Return ``indent + stmt`` from the per-level constant cache."""
+        while len(self._simple) <= self.level:
+            self._simple.append({})
+        cache = self._simple[self.level]
+        line = cache.get(stmt)
+        if line is None:
+            line = cache[stmt] = self.get_indent() + stmt
+        return line
+
+    def indent(self) -> None:
+        self.level += 1
+
+    def dedent(self) -> None:
+        if self.level > 0:
+            self.level -= 1
+
+    def get_indent(self) -> str:
+        while len(self._cache) <= self.level:
+            self._cache.append(self._cache[-1] + self.indent_str)
+        return self._cache[self.level]
+
+
+# One emission template per statement form, interned at import time.
+# Block templates include the indent placeholder; simple-statement
+# templates are indented by map_line.
+_TEMPLATES = {
+    "DEF": "{indent}def {name}({params}):",
+    "IF": "{indent}if {cond}:",
+    "ELIF": "{indent}elif {cond}:",
+    "WHILE": "{indent}while {cond}:",
+    "FOR": "{indent}for {var} in {iterable}:",
+    "EXCEPT": "{indent}except {exc}:",
+    "RETURN": "return {value}",
+    "SET": "{name} = {value}",
+    "CALL": "{fn}({values})",
+    "ARITH": "{target} = {left} {op} {right}",
+}
+
+
+def map_def(args: List[str], ctx: "IndentContext") -> None:
+    ctx.out.append(
+        _TEMPLATES["DEF"].format_map(
+            {
+                "indent": ctx.get_indent(),
+                "name": args[0],
+                "params": ", ".join(args[1:]),
+            }
+        )
+    )
+    ctx.indent()
+
+
+def map_if(args: List[str], ctx: "IndentContext") -> None:
+    ctx.out.append(
+        _TEMPLATES["IF"].format_map(
+            {"indent": ctx.get_indent(), "cond": build_condition(args)}
+        )
+    )
+    ctx.indent()
+
+
+def map_elif(args: List[str], ctx: "IndentContext") -> None:
+    ctx.out.append(
+        _TEMPLATES["ELIF"].format_map(
+            {"indent": ctx.get_indent(), "cond": build_condition(args)}
+        )
+    )
+    ctx.indent()
+
+
+def map_else(args: List[str], ctx: "IndentContext") -> None:
+    ctx.out.append(ctx.simple("else:"))
+    ctx.indent()
+
+
+def map_while(args: List[str], ctx: "IndentContext") -> None:
+    ctx.out.append(
+        _TEMPLATES["WHILE"].format_map(
+            {"indent": ctx.get_indent(), "cond": build_condition(args)}
+        )
+    )
+    ctx.indent()
+
+
+def map_for(args: List[str], ctx: "IndentContext") -> None:
+    ctx.out.append(
+        _TEMPLATES["FOR"].format_map(
+            {
+                "indent": ctx.get_indent(),
+                "var": args[0],
+                "iterable": to_py_value(args[-1]),
+            }
+        )
+    )
+    ctx.indent()
+
+
+def map_try(args: List[str], ctx: "IndentContext") -> None:
+    ctx.out.append(ctx.simple("try:"))
+    ctx.indent()
+
+
+_EXCEPTION_MAP = {"零除错误": "ZeroDivisionError", "其他错误": "Exception"}
+
+
+def map_except(args: List[str], ctx: "IndentContext") -> None:
+    kind = args[0] if args else "其他错误"
+    ctx.out.append(
+        _TEMPLATES["EXCEPT"].format_map(
+            {"indent": ctx.get_indent(), "exc": _EXCEPTION_MAP.get(kind, kind)}
+        )
+    )
+    ctx.indent()
+
+
+def map_finally(args: List[str], ctx: "IndentContext") -> None:
+    ctx.out.append(ctx.simple("finally:"))
+    ctx.indent()
+
+
+def map_return(args: List[str]) -> str:
+    if args:
+        return _TEMPLATES["RETURN"].format_map({"value": to_py_value(args[0])})
+    return "return"
+
+
+def map_print(args: List[str]) -> str:
+    return _TEMPLATES["CALL"].format_map(
+        {"fn": "print", "values": ", ".join(to_py_value(arg) for arg in args)}
+    )
+
+
+_CALLABLE_NAMES = frozenset(("读数", "读文", "input", "float", "int", "str"))
+_CALLABLE_FORMS = {"读数": "float(input())", "读文": "input()"}
+
+
+def map_set(args: List[str]) -> str:
+    name, value = args[0], args[1]
+    if value in _CALLABLE_NAMES:
+        value_py = _CALLABLE_FORMS.get(value, value + "()")
+    else:
+        value_py = to_py_value(value)
+    return _TEMPLATES["SET"].format_map({"name": name, "value": value_py})
+
+
+def map_call(args: List[str]) -> str:
+    return _TEMPLATES["CALL"].format_map(
+        {"fn": args[0], "values": ", ".join(to_py_value(arg) for arg in args[1:])}
+    )
+
+
+def map_arithmetic(args: List[str], op: str) -> str:
+    return _TEMPLATES["ARITH"].format_map(
+        {
+            "target": args[0],
+            "left": to_py_value(args[1]),
+            "op": op,
+            "right": to_py_value(args[2]),
+        }
+    )
+
+
+def map_arrow(args: List[str]) -> str:
+    target = args[-1]
+    if target in ("打印", "print"):
+        target = "print"
+    return _TEMPLATES["CALL"].format_map(
+        {"fn": target, "values": ", ".join(to_py_value(arg) for arg in args[:-1])}
+    )
+
+
+# Dispatch tables, built once at import time.  Block handlers take
+# (args, ctx) and manage indentation themselves; simple handlers take
+# args and return a bare statement string; arithmetic actions map to
+# their Python operator.
+_BLOCK_HANDLERS = {
+    "DEF": map_def,
+    "IF": map_if,
+    "ELIF": map_elif,
+    "ELSE": map_else,
+    "WHILE": map_while,
+    "FOR": map_for,
+    "TRY": map_try,
+    "EXCEPT": map_except,
+    "FINALLY": map_finally,
+}
+
+_SIMPLE_HANDLERS = {
+    "RETURN": map_return,
+    "PRINT": map_print,
+    "SET": map_set,
+    "CALL": map_call,
+}
+
+# Constant statements served from the per-level cache on IndentContext.
+_CONST_STMTS = {"BREAK": "break", "CONTINUE": "continue", "PASS": "pass"}
+
+_ARITH = {"ADD": "+", "SUB": "-", "MUL": "*", "DIV": "/"}
+
+
+def map_line(stmt: Line, ctx: "IndentContext") -> None:
+    action = stmt.action
+    args = stmt.args
+    handler = _BLOCK_HANDLERS.get(action)
+    if handler is not None:
+        return handler(args, ctx)
+    word = _CONST_STMTS.get(action)
+    if word is not None:
+        ctx.out.append(ctx.simple(word))
+        return
+    handler = _SIMPLE_HANDLERS.get(action)
+    if handler is not None:
+        ctx.out.append(ctx.get_indent() + handler(args))
+        return
+    op = _ARITH.get(action)
+    if op is not None:
+        ctx.out.append(ctx.get_indent() + map_arithmetic(args, op))
+        return
+    raise CatapillarMappingError(
+        f"unknown action {action!r} on line {stmt.line_state}"
+    )
+
+
+def map_statement(stmt, ctx: "IndentContext") -> None:
+    if isinstance(stmt, Line):  # covers Block, a Line subclass
+        return map_line(stmt, ctx)
+    if isinstance(stmt, BlockEnd):
+        ctx.dedent()
+        return
+    if isinstance(stmt, Arrow):
+        ctx.out.append(ctx.get_indent() + map_arrow(stmt.args))
+        return
+    raise CatapillarMappingError(
+        f"unknown node {stmt!r}"
+    )
+
+
+def map_program(program: Program, ctx: "IndentContext") -> None:
+    # Flows and segments are purely organizational, so walk them inline
+    # rather than paying two extra call frames per statement.
+    for flow in program.flows:
+        for segment in flow.segments:
+            for stmt in segment.lines:
+                map_statement(stmt, ctx)
+
+
+def map_program_to_python(program: Program) -> str:
+    """Emit the Python source for a parsed Program tree."""
+    ctx = IndentContext()
+    map_program(program, ctx)
+    return "\n".join(ctx.out)
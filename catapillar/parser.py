@@ -0,0 +1,244 @@
+"""Tokenizer and parser for ``.cat`` sources.
+
+A program is a sequence of *flows*, each made of *segments*, each made of
+statement lines.  The surface syntax is line oriented: the first token of a
+line names an action (in Chinese or English) and the remaining tokens are
+its arguments.  Block-opening statements end with a colon and are closed by
+an explicit end word (``完`` / ``end``).  Lines containing ``->`` use the
+newer arrow (pipeline) form.
+"""
+
+import types
+from typing import Dict, List
+
+
+class CatapillarSyntaxError(SyntaxError):
+    """Raised when a source line cannot be parsed."""
+
+
+class Program:
+    """Root node: an ordered list of flows."""
+
+    __slots__ = ("flows",)
+
+    def __init__(self):
+        self.flows: List["Flow"] = []
+
+    def __repr__(self):
+        return f"Program(flows={self.flows!r})"
+
+
+class Flow:
+    __slots__ = ("name", "segments")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.segments: List["Segment"] = []
+
+    def __repr__(self):
+        return f"Flow(name={self.name!r}, segments={self.segments!r})"
+
+
+class Segment:
+    __slots__ = ("name", "lines")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lines: list = []
+
+    def __repr__(self):
+        return f"Segment(name={self.name!r}, lines={self.lines!r})"
+
+
+class Line:
+    """A legacy action statement (``设 x 1``, ``否则:``, ...)."""
+
+    __slots__ = ("action", "args", "line_state")
+
+    def __init__(self, action: str, args: List[str], line_state: int):
+        self.action = action
+        self.args = args
+        self.line_state = line_state
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(action={self.action!r}, "
+            f"args={self.args!r}, line_state={self.line_state})"
+        )
+
+
+class Block(Line):
+    """A block-opening statement; same shape as Line, distinct type."""
+
+    __slots__ = ()
+
+
+class Arrow:
+    """An arrow (pipeline) statement: ``value ... -> target``."""
+
+    __slots__ = ("args", "line_state")
+
+    def __init__(self, args: List[str], line_state: int):
+        self.args = args
+        self.line_state = line_state
+
+    def __repr__(self):
+        return f"Arrow(args={self.args!r}, line_state={self.line_state})"
+
+
+class BlockEnd:
+    """The ``完``/``end`` terminator closing the innermost block."""
+
+    __slots__ = ("line_state",)
+
+    def __init__(self, line_state: int):
+        self.line_state = line_state
+
+    def __repr__(self):
+        return f"BlockEnd(line_state={self.line_state})"
+
+
+# Action identifiers and the surface words that select them.
+ACTION_IDS: Dict[str, tuple] = {
+    "SET": ("设", "set"),
+    "PRINT": ("打印", "print"),
+    "RETURN": ("返回", "return"),
+    "CALL": ("调", "call"),
+    "ADD": ("加", "add"),
+    "SUB": ("减", "sub"),
+    "MUL": ("乘", "mul"),
+    "DIV": ("除", "div"),
+    "BREAK": ("破", "break"),
+    "CONTINUE": ("继", "continue"),
+    "PASS": ("过", "pass"),
+    "DEF": ("定义", "def"),
+    "IF": ("如果", "if"),
+    "ELIF": ("又如", "elif"),
+    "WHILE": ("当", "while"),
+    "FOR": ("取", "for"),
+    "EXCEPT": ("捕", "except"),
+}
+
+# Structural keywords that open a new flow or segment.
+STRUCT_IDS: Dict[str, tuple] = {
+    "FLOW": ("流程", "flow"),
+    "SEGMENT": ("段", "segment"),
+}
+
+ACTION_LOOKUP = types.MappingProxyType(
+    {word: aid for aid, words in ACTION_IDS.items() for word in words}
+)
+STRUCT_LOOKUP = types.MappingProxyType(
+    {word: sid for sid, words in STRUCT_IDS.items() for word in words}
+)
+
+# Fused word table used by parse_tokens: one hash probe resolves a token to
+# either an action ("A") or a structural keyword ("S").
+_LOOKUP = {word: ("A", aid) for word, aid in ACTION_LOOKUP.items()}
+_LOOKUP.update({word: ("S", sid) for word, sid in STRUCT_LOOKUP.items()})
+
+# Actions that open an indented block in the generated Python.
+BLOCK_ACTIONS = {"DEF", "IF", "ELIF", "WHILE", "FOR", "EXCEPT"}
+
+END_WORDS = ("完", "end")
+
+# Bare block keywords that carry their colon in the token itself.
+_COLON_ACTIONS = {
+    "否则:": "ELSE",
+    "else:": "ELSE",
+    "试:": "TRY",
+    "try:": "TRY",
+    "终于:": "FINALLY",
+    "finally:": "FINALLY",
+}
+
+
+def tokenize(source: str) -> List[List[str]]:
+    """Split *source* into one token list per meaningful line.
+
+    Blank lines and ``#`` comment lines are dropped.
+    """
+    token_lines = []
+    for raw in source.splitlines():
+        stripped = raw.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        token_lines.append(stripped.split())
+    return token_lines
+
+
+def parse_tokens(token_lines: List[List[str]]) -> Program:
+    """Build the Program tree from tokenized lines.
+
+    Statements before any explicit ``流程``/``段`` keyword land in an
+    implicit main flow and segment.
+    """
+    program = Program()
+    current_flow = None
+    current_segment = None
+    line_state = 0
+
+    for tokens in token_lines:
+        line_state += 1
+        raw_action = tokens[0]
+        raw_args = tokens[1:]
+
+        tag_id = _LOOKUP.get(raw_action)
+        struct_id = tag_id[1] if tag_id is not None and tag_id[0] == "S" else None
+        if struct_id == "FLOW":
+            current_flow = Flow(raw_args[0] if raw_args else "主")
+            program.flows.append(current_flow)
+            current_segment = None
+            continue
+        if struct_id == "SEGMENT":
+            if current_flow is None:
+                current_flow = Flow("主")
+                program.flows.append(current_flow)
+            current_segment = Segment(raw_args[0] if raw_args else "开始")
+            current_flow.segments.append(current_segment)
+            continue
+
+        if current_flow is None:
+            current_flow = Flow("主")
+            program.flows.append(current_flow)
+        if current_segment is None:
+            current_segment = Segment("开始")
+            current_flow.segments.append(current_segment)
+
+        if raw_action in END_WORDS:
+            current_segment.lines.append(BlockEnd(line_state))
+            continue
+
+        if "->" in tokens:
+            args = [token for token in tokens if token != "->"]
+            current_segment.lines.append(Arrow(args, line_state))
+            continue
+
+        colon_action = _COLON_ACTIONS.get(raw_action)
+        if colon_action is not None:
+            current_segment.lines.append(Line(colon_action, [], line_state))
+            continue
+        if raw_action.endswith(":"):
+            raise CatapillarSyntaxError(
+                f"unknown block keyword {raw_action!r} on line {line_state}"
+            )
+
+        action_id = tag_id[1] if tag_id is not None else None
+        if action_id is None:
+            raise CatapillarSyntaxError(
+                f"unknown action {raw_action!r} on line {line_state}"
+            )
+        # Strip the block-opening colon here, once, so no map_* handler
+        # ever needs a defensive rstrip(":").  A lone ":" is a value
+        # atom, not a block colon, and must survive intact.
+        if raw_args and len(raw_args[-1]) > 1 and raw_args[-1].endswith(":"):
+            raw_args[-1] = raw_args[-1][:-1]
+        node_cls = Block if action_id in BLOCK_ACTIONS else Line
+        current_segment.lines.append(node_cls(action_id, raw_args, line_state))
+
+    return program
+
+
+def parse(source: str) -> Program:
+    """Parse *source* text into a Program tree."""
+    return parse_tokens(tokenize(source))
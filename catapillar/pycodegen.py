@@ -0,0 +1,179 @@
+"""Lower a Program tree straight to a Python code object.
+
+:func:`compile_program` builds :mod:`ast` nodes for the statement
+structure and hands them to :func:`compile`, so executing a program no
+longer round-trips through generated source text and CPython's full
+tokenizer/parser.  Expression fragments (conditions, atom values) are
+still parsed individually in ``eval`` mode via the string helpers the
+mapper already provides.
+"""
+
+import ast
+
+from .mapper import (
+    _ARITH,
+    _EXCEPTION_MAP,
+    CatapillarMappingError,
+    build_condition,
+    map_arithmetic,
+    map_arrow,
+    map_call,
+    map_print,
+    map_set,
+    to_py_value,
+)
+from .parser import Arrow, BlockEnd, Line
+
+
+def _expr(source: str) -> ast.expr:
+    return ast.parse(source, mode="eval").body
+
+
+def _stmt(source: str) -> ast.stmt:
+    return ast.parse(source).body[0]
+
+
+def _empty_arguments(names):
+    return ast.arguments(
+        posonlyargs=[],
+        args=[ast.arg(arg=name) for name in names],
+        vararg=None,
+        kwonlyargs=[],
+        kw_defaults=[],
+        kwarg=None,
+        defaults=[],
+    )
+
+
+def _elif_target(body):
+    """Find the If node an elif following a BlockEnd attaches to."""
+    if not body or not isinstance(body[-1], ast.If):
+        raise CatapillarMappingError("elif without a preceding if")
+    target = body[-1]
+    while len(target.orelse) == 1 and isinstance(target.orelse[0], ast.If):
+        target = target.orelse[0]
+    return target
+
+
+def _else_target(body):
+    """Find the orelse list an else following a BlockEnd attaches to.
+
+    The text mapper emits ``else:`` after any closed block, which Python
+    accepts for if/for/while and for try (given handlers); attach to the
+    same constructs so both exec paths agree.
+    """
+    if body:
+        target = body[-1]
+        if isinstance(target, ast.If):
+            return _elif_target(body).orelse
+        if isinstance(target, (ast.For, ast.While, ast.Try)):
+            return target.orelse
+    raise CatapillarMappingError("else without a preceding block")
+
+
+def _try_target(body):
+    if not body or not isinstance(body[-1], ast.Try):
+        raise CatapillarMappingError("except/finally without a preceding try")
+    return body[-1]
+
+
+def _lower_statement(stmt, stack) -> None:
+    body = stack[-1]
+    if isinstance(stmt, BlockEnd):
+        if len(stack) > 1:
+            closed = stack.pop()
+            if not closed:
+                # The text path emits a block header with no body, which
+                # is a SyntaxError when the source is compiled; fail the
+                # same programs here rather than padding with pass.
+                raise CatapillarMappingError(
+                    f"empty block closed on line {stmt.line_state}"
+                )
+        return
+    if isinstance(stmt, Arrow):
+        body.append(_stmt(map_arrow(stmt.args)))
+        return
+    if not isinstance(stmt, Line):
+        raise CatapillarMappingError(f"unknown node {stmt!r}")
+
+    action = stmt.action
+    args = stmt.args
+    if action == "DEF":
+        node = ast.FunctionDef(
+            name=args[0],
+            args=_empty_arguments(args[1:]),
+            body=[],
+            decorator_list=[],
+            returns=None,
+        )
+        body.append(node)
+        stack.append(node.body)
+    elif action == "IF":
+        node = ast.If(test=_expr(build_condition(args)), body=[], orelse=[])
+        body.append(node)
+        stack.append(node.body)
+    elif action == "ELIF":
+        node = ast.If(test=_expr(build_condition(args)), body=[], orelse=[])
+        _elif_target(body).orelse.append(node)
+        stack.append(node.body)
+    elif action == "ELSE":
+        stack.append(_else_target(body))
+    elif action == "WHILE":
+        node = ast.While(test=_expr(build_condition(args)), body=[], orelse=[])
+        body.append(node)
+        stack.append(node.body)
+    elif action == "FOR":
+        node = ast.For(
+            target=ast.Name(id=args[0], ctx=ast.Store()),
+            iter=_expr(to_py_value(args[-1])),
+            body=[],
+            orelse=[],
+        )
+        body.append(node)
+        stack.append(node.body)
+    elif action == "TRY":
+        node = ast.Try(body=[], handlers=[], orelse=[], finalbody=[])
+        body.append(node)
+        stack.append(node.body)
+    elif action == "EXCEPT":
+        kind = args[0] if args else "其他错误"
+        handler = ast.ExceptHandler(
+            type=_expr(_EXCEPTION_MAP.get(kind, kind)), name=None, body=[]
+        )
+        _try_target(body).handlers.append(handler)
+        stack.append(handler.body)
+    elif action == "FINALLY":
+        stack.append(_try_target(body).finalbody)
+    elif action == "RETURN":
+        body.append(ast.Return(value=_expr(to_py_value(args[0])) if args else None))
+    elif action == "BREAK":
+        body.append(ast.Break())
+    elif action == "CONTINUE":
+        body.append(ast.Continue())
+    elif action == "PASS":
+        body.append(ast.Pass())
+    elif action == "PRINT":
+        body.append(_stmt(map_print(args)))
+    elif action == "SET":
+        body.append(_stmt(map_set(args)))
+    elif action == "CALL":
+        body.append(_stmt(map_call(args)))
+    elif action in _ARITH:
+        body.append(_stmt(map_arithmetic(args, _ARITH[action])))
+    else:
+        raise CatapillarMappingError(
+            f"unknown action {action!r} on line {stmt.line_state}"
+        )
+
+
+def compile_program(program, filename: str = "<cat>"):
+    """Compile a parsed Program tree to an executable code object."""
+    top = []
+    stack = [top]
+    for flow in program.flows:
+        for segment in flow.segments:
+            for stmt in segment.lines:
+                _lower_statement(stmt, stack)
+    module = ast.Module(body=top, type_ignores=[])
+    ast.fix_missing_locations(module)
+    return compile(module, filename, "exec")
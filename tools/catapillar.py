@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Command line front end: transpile (and optionally run) ``.cat`` files."""
+
+import argparse
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from catapillar import __version__, map_program_to_python, parse  # noqa: E402
+from catapillar.mapper import pretag_program  # noqa: E402
+from catapillar.parser import Arrow, Line  # noqa: E402
+from catapillar.pycodegen import compile_program  # noqa: E402
+
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "catapillar")
+
+
+def _cache_path(source_bytes):
+    """Cache file for this exact source under the current mapper version."""
+    digest = hashlib.blake2b(
+        source_bytes + __version__.encode("ascii"), digest_size=16
+    ).hexdigest()
+    return os.path.join(_CACHE_DIR, digest + ".py")
+
+
+def _atomic_write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+    os.replace(tmp_path, path)
+
+
+def _iter_lines_from_ast(program):
+    """Yield every statement node in the Program tree, in source order."""
+    for flow in program.flows:
+        for segment in flow.segments:
+            for stmt in segment.lines:
+                yield stmt
+
+
+def _classify_ast(program):
+    """Return (has_legacy_lines, has_arrows) in a single AST walk."""
+    has_legacy = False
+    has_arrows = False
+    for stmt in _iter_lines_from_ast(program):
+        if isinstance(stmt, Line):  # covers Block
+            has_legacy = True
+        elif isinstance(stmt, Arrow):
+            has_arrows = True
+        if has_legacy and has_arrows:
+            break
+    return has_legacy, has_arrows
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog="catapillar", description="Transpile a .cat file to Python."
+    )
+    arg_parser.add_argument("file", help="path to the .cat source file")
+    arg_parser.add_argument(
+        "--exec", action="store_true", dest="do_exec",
+        help="run the generated Python after printing it",
+    )
+    arg_parser.add_argument(
+        "--show-ast", action="store_true", help="also print the parsed tree"
+    )
+    args = arg_parser.parse_args(argv)
+
+    with open(args.file, "rb") as handle:
+        source_bytes = handle.read()
+
+    # Repeated runs over an unchanged file (editor save, CI loop) skip
+    # parse and map entirely; the style line is cached as the first line.
+    cache_path = _cache_path(source_bytes)
+    cached = None
+    if not args.show_ast and os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as handle:
+            cached = handle.read()
+
+    if cached is not None:
+        style_line, _, py_code = cached.partition("\n")
+        program = None
+    else:
+        program = parse(source_bytes.decode("utf-8"))
+        pretag_program(program)
+        py_code = map_program_to_python(program)
+        has_legacy, has_arrows = _classify_ast(program)
+        style = []
+        if has_legacy:
+            style.append("lines")
+        if has_arrows:
+            style.append("arrows")
+        style_line = f"# style: {'+'.join(style) or 'empty'}"
+        _atomic_write(cache_path, style_line + "\n" + py_code)
+
+    # One writelines instead of a print per section: a single lock/flush
+    # of stdout.  Code run under --exec still prints normally.
+    out = [style_line, "\n=== PYTHON ===\n", py_code, "\n"]
+    if args.show_ast:
+        out += ["=== AST ===\n", repr(program), "\n"]
+    if args.do_exec:
+        out.append("=== EXEC ===\n")
+    sys.stdout.writelines(out)
+    if args.do_exec:
+        namespace = {"__name__": "__main__"}
+        if program is not None:
+            # Lower the tree straight to a code object; no reparse of the
+            # generated source.  Cache hits have no tree, so they exec the
+            # cached text instead.
+            exec(compile_program(program, filename=args.file), namespace)
+        else:
+            exec(py_code, namespace)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())